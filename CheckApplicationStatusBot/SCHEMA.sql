@@ -0,0 +1,23 @@
+-- Indexes the bot's queries rely on. Table names are the defaults; adjust them
+-- if TICKETS_TABLE_NAME etc. are overridden in .env.
+-- services/db_service.py lists the same indexes in TICKET_INDEXES, warns at
+-- startup when one is missing, and get_ticket_service().ensure_indexes()
+-- creates them.
+
+-- Ticket summary (/tickets, scheduled sends): fetch_ticket_stats filters on
+-- department_id and status and groups by building and specialist. With this
+-- index the counts are an index-only range scan, no table rows are read.
+CREATE INDEX idx_tickets_dept_status_bldg_spec
+    ON DB_TICKETS (department_id, status, building_id, specialist_id);
+
+-- Ticket lists (fetch_tickets_by_status, iter_tickets_by_status,
+-- fetch_tickets_with_users): equality on department_id and status, newest
+-- first, keyset-paginated on id. MySQL reads this index backwards for
+-- ORDER BY id DESC, so there is no filesort, and "id < ?" seeks straight to
+-- the next page.
+CREATE INDEX idx_tickets_dept_status_id
+    ON DB_TICKETS (department_id, status, id);
+-- MySQL has no partial indexes (... WHERE status = 'new'), and neither index
+-- needs one: status is part of both prefixes, so the "new"/"taken" queries
+-- only read the index range of currently open tickets, never the closed
+-- history, without a trigger-maintained open-tickets table.
@@ -1,19 +1,28 @@
 import os
 import json
+import asyncio
 import logging
 import sys
 import datetime
+import fcntl
+import functools
+from collections import Counter
+from html import escape as _html_escape
 from pathlib import Path
+from typing import Iterable, Mapping, Optional
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from telegram import (
+    CallbackQuery,
     Update,
     ReplyKeyboardMarkup,
     KeyboardButton,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
+    MessageEntity,
 )
 from telegram.ext import (
+    AIORateLimiter,
     Application,
     CommandHandler,
     MessageHandler,
@@ -21,12 +30,22 @@ from telegram.ext import (
     CallbackQueryHandler,
     filters,
     ContextTypes,
+    JobQueue,
 )
-from telegram.error import TimedOut, NetworkError, TelegramError
-from services.db_service import get_ticket_service
+from telegram.error import BadRequest, Forbidden, TimedOut, NetworkError, TelegramError
+from models import TicketStat, TicketWithUsers
+from services.cache import ttl_cache
+from services.db_service import MySQLTicketService, get_ticket_service
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import uvloop  # Optional: faster event loop for polling and broadcasts
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson  # Optional: faster encoding/decoding of the chat IDs log
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -34,69 +53,267 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Bot token from environment variables
-BOT_TOKEN = os.getenv("BOT_TOKEN")
-if not BOT_TOKEN:
-    raise ValueError(
-        "BOT_TOKEN not found in environment variables. Please check your .env file."
+# Set from the environment by _bootstrap() when the bot starts
+ANNOUNCE_CHAT_ID: Optional[int] = None
+
+# Composed replies are reused for a short while to absorb bursts of requests;
+# the summary TTL can be overridden with TICKETS_CACHE_TTL (see _bootstrap)
+SUMMARY_CACHE_TTL = 30.0
+TICKETS_LIST_CACHE_TTL = 10
+
+# Telegram rejects messages longer than 4096 characters; keep a safety margin
+MAX_MESSAGE_LENGTH = 4000
+
+# Max scheduled messages in flight at once (Telegram allows ~30 msg/s per bot)
+BROADCAST_CONCURRENCY = 25
+
+# Scheduled summary broadcasts (Astana time). В PTB v20+ и datetime.weekday():
+# 0 = понедельник, 6 = воскресенье. Нам нужны будни (пн–пт).
+BROADCAST_TIMES = tuple(
+    sorted(
+        {
+            datetime.time(8, 30),
+            datetime.time(12, 0),
+            datetime.time(15, 0),
+            datetime.time(17, 25),
+        }
     )
+)
+BROADCAST_DAYS = (0, 1, 2, 3, 4)
 
-ticket_service = get_ticket_service()
-ANNOUNCE_CHAT_ID_RAW = os.getenv("ANNOUNCE_CHAT_ID")
-ANNOUNCE_CHAT_ID = int(ANNOUNCE_CHAT_ID_RAW) if ANNOUNCE_CHAT_ID_RAW else None
-
-# File to store tracked chat IDs
+# Tracked chat IDs are kept in an append-only log of {"op": "add"|"remove", "id": ...}
+# records; CHAT_IDS_FILE is the old full-snapshot format, read only for migration
+CHAT_IDS_LOG = Path("chat_ids.jsonl")
 CHAT_IDS_FILE = Path("chat_ids.json")
+# Rewrite the log once it holds this many records per tracked chat
+CHAT_IDS_COMPACT_FACTOR = 10
 
+# Number of records currently in CHAT_IDS_LOG, used to decide on compaction
+_chat_ids_log_records = 0
+# st_mtime_ns of CHAT_IDS_LOG as of our last read or write of it
+_chat_ids_log_mtime_ns = 0
 
-def load_chat_ids() -> set[int]:
-    """Load tracked chat IDs from file."""
+# Both accept bytes; orjson.JSONDecodeError is a ValueError like json's
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _chat_ids_record(op: str, chat_id: int) -> bytes:
+    """Encode one chat IDs log line."""
+    record = {"op": op, "id": chat_id}
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record).encode() + b"\n"
+
+
+def _remember_chat_ids_log_mtime() -> None:
+    """Record the log's current mtime so our own writes don't trigger a reload."""
+    global _chat_ids_log_mtime_ns
+    try:
+        _chat_ids_log_mtime_ns = CHAT_IDS_LOG.stat().st_mtime_ns
+    except OSError:
+        _chat_ids_log_mtime_ns = 0
+
+
+def _load_legacy_chat_ids() -> set[int]:
+    """Load tracked chat IDs from the old JSON snapshot file."""
     if CHAT_IDS_FILE.exists():
         try:
-            with open(CHAT_IDS_FILE, "r") as f:
-                data = json.load(f)
-                return set(data.get("chat_ids", []))
+            data = _json_loads(CHAT_IDS_FILE.read_bytes())
+            return set(data.get("chat_ids", []))
         except Exception as e:
             logger.error(f"Failed to load chat IDs: {e}")
             return set()
     return set()
 
 
+def load_chat_ids() -> set[int]:
+    """Replay the chat IDs log (or the legacy snapshot if there is no log yet)."""
+    global _chat_ids_log_records
+    if not CHAT_IDS_LOG.exists():
+        return _load_legacy_chat_ids()
+
+    chat_ids: set[int] = set()
+    records = 0
+    malformed = False
+    try:
+        with open(CHAT_IDS_LOG, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = _json_loads(line)
+                except ValueError:
+                    # A crash mid-append can leave a torn last line
+                    logger.warning(f"Skipping malformed chat IDs record: {line!r}")
+                    malformed = True
+                    continue
+                records += 1
+                if record.get("op") == "add":
+                    chat_ids.add(record["id"])
+                elif record.get("op") == "remove":
+                    chat_ids.discard(record["id"])
+    except Exception as e:
+        logger.error(f"Failed to load chat IDs: {e}")
+        return set()
+    _chat_ids_log_records = records
+    _remember_chat_ids_log_mtime()
+    if malformed:
+        # Rewrite so later appends don't land on the end of a broken line
+        save_chat_ids(chat_ids)
+    return chat_ids
+
+
 def save_chat_ids(chat_ids: set[int]) -> None:
-    """Save tracked chat IDs to file."""
+    """Rewrite the log as one "add" record per chat (temp file, then rename)."""
+    global _chat_ids_log_records
+    tmp_file = CHAT_IDS_LOG.with_name(CHAT_IDS_LOG.name + ".tmp")
     try:
-        with open(CHAT_IDS_FILE, "w") as f:
-            json.dump({"chat_ids": list(chat_ids)}, f, indent=2)
+        # Sorted so the compacted file is stable across rewrites
+        records = [_chat_ids_record("add", chat_id) for chat_id in sorted(chat_ids)]
+        with open(tmp_file, "wb") as f:
+            f.write(b"".join(records))
+        os.replace(tmp_file, CHAT_IDS_LOG)
+        _chat_ids_log_records = len(chat_ids)
+        _remember_chat_ids_log_mtime()
     except Exception as e:
         logger.error(f"Failed to save chat IDs: {e}")
 
 
-# Global set to track active chat IDs
-tracked_chat_ids = load_chat_ids()
-if tracked_chat_ids:
-    logger.info(f"Loaded {len(tracked_chat_ids)} tracked chat IDs from file")
-if ANNOUNCE_CHAT_ID and ANNOUNCE_CHAT_ID not in tracked_chat_ids:
-    tracked_chat_ids.add(ANNOUNCE_CHAT_ID)
-    save_chat_ids(tracked_chat_ids)
-    logger.info(f"Added ANNOUNCE_CHAT_ID {ANNOUNCE_CHAT_ID} to tracked chats")
+def append_chat_ids_ops(op: str, chat_ids: Iterable[int]) -> None:
+    """
+    Append one `op` ("add" or "remove") record per chat ID to the log in a
+    single write, then compact the log if it has grown too long.
+    """
+    global _chat_ids_log_records
+    records = [_chat_ids_record(op, chat_id) for chat_id in chat_ids]
+    if not records:
+        return
+    try:
+        with open(CHAT_IDS_LOG, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(b"".join(records))
+        _chat_ids_log_records += len(records)
+        _remember_chat_ids_log_mtime()
+    except Exception as e:
+        logger.error(f"Failed to append chat IDs: {e}")
+        return
+    if _chat_ids_log_records > CHAT_IDS_COMPACT_FACTOR * max(len(tracked_chat_ids), 1):
+        save_chat_ids(tracked_chat_ids)
+
+
+# Global set to track active chat IDs; filled from the log by _bootstrap()
+tracked_chat_ids: set[int] = set()
+
+
+def reload_chat_ids_if_changed() -> None:
+    """
+    Re-read the chat IDs log into `tracked_chat_ids` only if something else
+    modified it since we last read or wrote it; otherwise this is one stat().
+    """
+    try:
+        mtime_ns = CHAT_IDS_LOG.stat().st_mtime_ns
+    except OSError:
+        return
+    if mtime_ns == _chat_ids_log_mtime_ns:
+        return
+    chat_ids = load_chat_ids()
+    tracked_chat_ids.clear()
+    tracked_chat_ids.update(chat_ids)
+    logger.info("Reloaded %d tracked chat IDs from file", len(tracked_chat_ids))
 
 
 def track_chat_id(chat_id: int) -> None:
     """Track a chat ID if not already tracked."""
-    global tracked_chat_ids
     if chat_id not in tracked_chat_ids:
         tracked_chat_ids.add(chat_id)
-        save_chat_ids(tracked_chat_ids)
+        append_chat_ids_ops("add", [chat_id])
         logger.info(f"Added new chat ID {chat_id} to tracked chats")
 
 
-try:
-    ASTANA_TZ = ZoneInfo("Asia/Almaty")  # Astana time zone
-except Exception:
-    # Fallback to fixed UTC+6 (Almaty/Astana) instead of UTC to keep local schedule
-    ASTANA_TZ = datetime.timezone(datetime.timedelta(hours=5), name="UTC+05")
-    logger = logging.getLogger(__name__)
-    logger.warning("Falling back to fixed UTC+06 timezone; could not load Asia/Almaty")
+@functools.cache
+def astana_tz() -> datetime.tzinfo:
+    """Astana time zone, loaded from tzdata on first use."""
+    try:
+        return ZoneInfo("Asia/Almaty")  # Astana time zone
+    except Exception:
+        # Fallback to fixed UTC+6 (Almaty/Astana) instead of UTC to keep local schedule
+        logger.warning(
+            "Falling back to fixed UTC+06 timezone; could not load Asia/Almaty"
+        )
+        return datetime.timezone(datetime.timedelta(hours=5), name="UTC+05")
+
+
+def next_broadcast_at(after: datetime.datetime) -> datetime.datetime:
+    """First BROADCAST_TIMES slot on one of BROADCAST_DAYS strictly after `after`."""
+    tz = astana_tz()
+    day = after.astimezone(tz).date()
+    for _ in range(8):
+        if day.weekday() in BROADCAST_DAYS:
+            for slot_time in BROADCAST_TIMES:
+                slot = datetime.datetime.combine(day, slot_time, tzinfo=tz)
+                if slot > after:
+                    return slot
+        day += datetime.timedelta(days=1)
+    raise ValueError("BROADCAST_DAYS and BROADCAST_TIMES must not be empty")
+
+
+def _bootstrap() -> str:
+    """
+    Load settings from the environment (.env) and the tracked chat IDs from
+    disk. Called from main() so importing this module has no side effects.
+    Returns the bot token.
+    """
+    global ANNOUNCE_CHAT_ID, SUMMARY_CACHE_TTL
+    load_dotenv()
+
+    # Bot token from environment variables
+    bot_token = os.getenv("BOT_TOKEN")
+    if not bot_token:
+        raise ValueError(
+            "BOT_TOKEN not found in environment variables. Please check your .env file."
+        )
+
+    announce_chat_id_raw = os.getenv("ANNOUNCE_CHAT_ID")
+    ANNOUNCE_CHAT_ID = int(announce_chat_id_raw) if announce_chat_id_raw else None
+    SUMMARY_CACHE_TTL = float(os.getenv("TICKETS_CACHE_TTL", SUMMARY_CACHE_TTL))
+
+    tracked_chat_ids.update(load_chat_ids())
+    if tracked_chat_ids:
+        logger.info(f"Loaded {len(tracked_chat_ids)} tracked chat IDs from file")
+    if not CHAT_IDS_LOG.exists() and tracked_chat_ids:
+        # Migrate the legacy snapshot into the log
+        save_chat_ids(tracked_chat_ids)
+    if ANNOUNCE_CHAT_ID and ANNOUNCE_CHAT_ID not in tracked_chat_ids:
+        tracked_chat_ids.add(ANNOUNCE_CHAT_ID)
+        append_chat_ids_ops("add", [ANNOUNCE_CHAT_ID])
+        logger.info(f"Added ANNOUNCE_CHAT_ID {ANNOUNCE_CHAT_ID} to tracked chats")
+    return bot_token
+
+
+@functools.cache
+def _svc() -> MySQLTicketService:
+    """Ticket service singleton; cache_info() shows whether it was created yet."""
+    return get_ticket_service()
+
+
+def clear_reference_cache() -> None:
+    """Drop cached buildings, categories and subcategories."""
+    if _svc.cache_info().currsize:
+        # Reference data is cached by the service; don't create it just for this
+        _svc().invalidate_reference_data()
+
+
+# Reply texts are built once at import rather than on every command
+START_TEMPLATE = "Добрый день, {first_name}! 👋\n\n{status_text}"
+HELP_TEXT = """
+Available commands:
+/start - Start the bot
+/help - Show this help message
+/status - Check status
+/tickets - Выжимка по новым заявкам (как в расписании)
+/new - Список всех новых заявок департамента 33
+/refresh, /refresh_cache - Сбросить кэш справочников (корпуса, категории)
+    """
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -106,9 +323,11 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if chat:
         track_chat_id(chat.id)
     first_name = user.first_name if user and user.first_name else "гость"
-    status_text = compose_bot_status_text()
+    status_text = await compose_bot_status_text()
     await update.message.reply_text(
-        f"Добрый день, {first_name}! 👋\n\n{status_text}",
+        START_TEMPLATE.format_map(
+            {"first_name": first_name, "status_text": status_text}
+        ),
         reply_markup=get_main_reply_keyboard(),
     )
     # Also show inline keyboard for callback-based actions
@@ -122,15 +341,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     chat = update.effective_chat
     if chat:
         track_chat_id(chat.id)
-    help_text = """
-Available commands:
-/start - Start the bot
-/help - Show this help message
-/status - Check status
-/tickets - Выжимка по новым заявкам (как в расписании)
-/new - Список всех новых заявок департамента 33
-    """
-    await update.message.reply_text(help_text, reply_markup=get_main_reply_keyboard())
+    await update.message.reply_text(HELP_TEXT, reply_markup=get_main_reply_keyboard())
 
 
 def get_main_reply_keyboard() -> ReplyKeyboardMarkup:
@@ -166,21 +377,18 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     chat = update.effective_chat
     if chat:
         track_chat_id(chat.id)
-    await update.message.reply_text(compose_bot_status_text())
+    await update.message.reply_text(await compose_bot_status_text())
 
 
-def compose_bot_status_text() -> str:
+async def compose_bot_status_text() -> str:
     """Return short health status that we can reuse in /start and /status."""
-    global ticket_service
-
     issues: list[str] = []
 
-    # Lazy-init the ticket service to detect obvious failures early.
-    if ticket_service is None:
-        try:
-            ticket_service = get_ticket_service()
-        except Exception:
-            issues.append("⚠️ Не удалось подключиться к сервису заявок")
+    # Lazy-init the ticket service and its DB pool to detect obvious failures early.
+    try:
+        await asyncio.to_thread(lambda: _svc().pool)
+    except Exception:
+        issues.append("⚠️ Не удалось подключиться к сервису заявок")
 
     if issues:
         return "\n".join(["Статус бота:", *issues])
@@ -188,110 +396,118 @@ def compose_bot_status_text() -> str:
     return "Статус бота:\n✅ Все работает штатно"
 
 
-def compose_new_tickets_summary() -> str:
+def _utf16_len(text: str) -> int:
+    """Length in UTF-16 code units, the unit Telegram uses for entity offsets."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def render_bold_lines(
+    lines: list[list[str]],
+) -> tuple[str, tuple[MessageEntity, ...]]:
+    """
+    Join lines of text segments into plain text plus bold entities; within each
+    line the odd-indexed segments are bold (like the parts between `*` pairs).
+    Sending entities instead of a parse_mode means no markup parsing or escaping.
+    """
+    parts: list[str] = []
+    entities: list[MessageEntity] = []
+    offset = 0
+    for line_no, segments in enumerate(lines):
+        if line_no:
+            parts.append("\n")
+            offset += 1
+        for idx, segment in enumerate(segments):
+            length = _utf16_len(segment)
+            if idx % 2 and length:
+                entities.append(MessageEntity(MessageEntity.BOLD, offset, length))
+            parts.append(segment)
+            offset += length
+    return "".join(parts), tuple(entities)
+
+
+@ttl_cache(seconds=lambda: SUMMARY_CACHE_TTL)
+async def compose_new_tickets_summary() -> tuple[str, tuple[MessageEntity, ...]]:
     """
     Compose a summary of tickets (counts only, no individual ticket details).
-    Returns summary grouped by building and specialist.
+    Returns summary grouped by building and specialist, as text plus the bold
+    entities to send with it (no parse_mode).
+    DB calls run in worker threads so the event loop stays responsive.
     """
-    global ticket_service
-    if ticket_service is None:
-        ticket_service = get_ticket_service()
-
-    # Fetch available tickets (unassigned/new tickets ready to be worked on)
-    # Try "available" status first, fallback to "new" if "available" returns empty
-    new_rows = ticket_service.fetch_tickets_by_status(
-        status="available", department_id=33, limit=1000, offset=0
-    )
-    # If "available" returns no results, try "new" status
-    if not new_rows:
-        new_rows = ticket_service.fetch_tickets_by_status(
-            status="new", department_id=33, limit=1000, offset=0
-        )
-
-    # Fetch taken tickets (status="taken" means in progress)
-    taken_rows = ticket_service.fetch_tickets_by_status(
-        status="taken", department_id=33, limit=1000, offset=0
-    )
+    svc = await asyncio.to_thread(_svc)
+
+    # One query returns counts per (status, building, specialist) together with
+    # specialist names and building descriptions.
+    stats = await asyncio.to_thread(svc.fetch_ticket_stats, department_id=33)
+    stats_by_status: dict[str, list[TicketStat]] = {}
+    for stat in stats:
+        stats_by_status.setdefault(stat.status, []).append(stat)
+
+    # Available tickets are unassigned/new tickets ready to be worked on.
+    # Fallback to "new" status if "available" returns empty
+    new_stats = stats_by_status.get("available") or stats_by_status.get("new", [])
+    # Taken tickets (status="taken" means in progress) with a specialist
+    taken_stats = [
+        stat
+        for stat in stats_by_status.get("taken", [])
+        if stat.specialist_id is not None
+    ]
 
-    lines = []
+    lines: list[list[str]] = []
 
     # Header
-    lines.append("📬 *Статистика заявок*")
+    lines.append(["📬 ", "Статистика заявок"])
 
-    total_count = len(new_rows) if new_rows else 0
-    lines.append(f"📊 *Всего новых:* {total_count}")
+    total_count = sum(stat.count for stat in new_stats)
+    lines.append(["📊 ", "Всего новых:", f" {total_count}"])
 
-    if new_rows:
-        per_building: dict[str, int] = {}
-        for ticket in new_rows:
-            # Only count, don't include individual ticket details
-            building_key = ticket.building_id
-            if building_key is None:
-                building_key = "не указан"
-            building_key = str(building_key)
-            per_building[building_key] = per_building.get(building_key, 0) + 1
+    if new_stats:
+        per_building: Counter[Optional[int]] = Counter()
+        building_labels: dict[Optional[int], str] = {}
+        for stat in new_stats:
+            per_building[stat.building_id] += stat.count
+            building_labels[stat.building_id] = stat.building_label
 
-        id_to_description = ticket_service.fetch_building_descriptions()
-        lines.append("🏠 *По адресам:*")
-        lines.append("")
+        lines.append(["🏠 ", "По адресам:"])
+        lines.append([""])
 
         # Separate "Другое" (unassigned/unknown) from regular buildings
-        other_count = per_building.get("не указан", 0)
-        regular_buildings = {k: v for k, v in per_building.items() if k != "не указан"}
+        other_count = per_building.pop(None, 0)
 
-        # Sort regular buildings by description
-        sorted_buildings = sorted(
-            regular_buildings.items(), key=lambda x: id_to_description.get(x[0], x[0])
-        )
+        # Sort regular buildings by description (one lookup per building)
+        decorated = [
+            (building_labels[building_id], building_id, count)
+            for building_id, count in per_building.items()
+        ]
+        decorated.sort()
 
-        for building_id, count in sorted_buildings:
-            readable = id_to_description.get(building_id, building_id)
-            lines.append(f"🏢 {readable} — *{count}*")
+        for readable, _, count in decorated:
+            lines.append([f"🏢 {readable} — ", str(count)])
 
         if other_count > 0:
-            lines.append(f"🏗 Другое — *{other_count}*")
+            lines.append(["🏗 Другое — ", str(other_count)])
 
     # Taken tickets section
-    if taken_rows:
-        lines.append("")
-        lines.append("")
-        lines.append("⚙️ *В работе:*")
-        lines.append("")
-
-        # Group taken tickets by specialist_id and building_id
-        per_specialist_building: dict[tuple, int] = {}
-        specialist_ids = set()
-
-        for ticket in taken_rows:
-            specialist_id = ticket.specialist_id
-            building_id = ticket.building_id
-
-            if specialist_id is None:
-                continue
-
-            specialist_ids.add(specialist_id)
-            building_key = building_id if building_id is not None else "не указан"
-            key = (specialist_id, building_key)
-            per_specialist_building[key] = per_specialist_building.get(key, 0) + 1
-
-        # Fetch user information for all specialists
-        if specialist_ids:
-            users_dict = ticket_service.fetch_users_by_ids(list(specialist_ids))
-            id_to_description = ticket_service.fetch_building_descriptions()
-
-            # Sort by specialist_id and building_id for consistent output
-            for (spec_id, building_id), count in sorted(
-                per_specialist_building.items()
-            ):
-                user = users_dict.get(spec_id)
-                full_name = user.full_name if user else f"ID {spec_id}"
-
-                building_desc = id_to_description.get(
-                    str(building_id), str(building_id)
-                )
-                lines.append(f"👷‍♂️ {full_name} — ({building_desc}) — *{count}*")
+    if taken_stats:
+        lines.append([""])
+        lines.append([""])
+        lines.append(["⚙️ ", "В работе:"])
+        lines.append([""])
+
+        # Sort by specialist_id and building_id for consistent output
+        taken_stats.sort(key=lambda stat: (stat.specialist_id, str(stat.building_id)))
+        for stat in taken_stats:
+            if stat.building_id is not None:
+                building_desc = stat.building_label
+            else:
+                building_desc = "не указан"
+            lines.append(
+                [
+                    f"👷‍♂️ {stat.specialist_name} — ({building_desc}) — ",
+                    str(stat.count),
+                ]
+            )
 
-    return "\n".join(lines)
+    return render_bold_lines(lines)
 
 
 async def tickets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -300,11 +516,11 @@ async def tickets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if chat:
         track_chat_id(chat.id)
     try:
-        text = compose_new_tickets_summary()
+        text, entities = await compose_new_tickets_summary()
         if not text or not text.strip():
             await update.message.reply_text("No tickets found.")
         else:
-            await update.message.reply_text(text, parse_mode="Markdown")
+            await update.message.reply_text(text, entities=entities)
     except Exception as e:
         logger.error(f"/tickets failed: {e}", exc_info=True)
         await update.message.reply_text(
@@ -312,52 +528,138 @@ async def tickets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         )
 
 
-def compose_new_tickets_list() -> str:
-
-    global ticket_service
-    if ticket_service is None:
-        ticket_service = get_ticket_service()
-
-    new_rows = ticket_service.fetch_tickets_by_status(
-        status="new", department_id=33, limit=1000, offset=0
+async def fetch_tickets_with_references(
+    status: str,
+) -> tuple[list[TicketWithUsers], Mapping[str, str], dict[int, str], dict[int, str]]:
+    """
+    Fetch department 33 tickets with the given status together with the
+    lookups needed to render them: buildings, categories, subcategories.
+    Tickets come with their applicant and specialist from one joined query
+    (a user the join didn't find is None); the rest is reference
+    data the service caches (see clear_reference_cache). Independent calls run
+    concurrently in worker threads.
+    """
+    # First call builds the DB pool, keep that off the event loop too
+    svc = await asyncio.to_thread(_svc)
+
+    ticket_rows, buildings_dict, categories = await asyncio.gather(
+        asyncio.to_thread(
+            svc.fetch_tickets_with_users,
+            status=status,
+            department_id=33,
+            limit=1000,
+        ),
+        asyncio.to_thread(svc.fetch_building_descriptions),
+        asyncio.to_thread(svc.fetch_categories_by_department_id, 33),
+    )
+    subcategories = await asyncio.to_thread(
+        svc.fetch_subcategories_by_category_ids, [cat.id for cat in categories]
     )
 
-    if not new_rows:
-        return "всего новых заявок: 0"
+    categories_dict = {cat.id: cat.name_ru or f"ID {cat.id}" for cat in categories}
+    subcategories_dict = {
+        subcat.id: subcat.name_ru or f"ID {subcat.id}"
+        for group in subcategories.values()
+        for subcat in group
+    }
+    return ticket_rows, buildings_dict, categories_dict, subcategories_dict
 
-    user_ids = set()
 
-    for ticket in new_rows:
-        user_id = ticket.user_id
+def esc(value: object) -> str:
+    """Escape a value for Telegram HTML (quotes are left as is)."""
+    return _html_escape(str(value), quote=False)
 
-        if user_id is not None:
-            user_ids.add(user_id)
 
-    users_dict = ticket_service.fetch_users_by_ids(list(user_ids))
-    buildings_dict = ticket_service.fetch_building_descriptions()
+def split_html_block(block: str, limit: int) -> list[str]:
+    """
+    Split one escaped HTML block longer than `limit` on line boundaries. A
+    <blockquote> wrapper is closed and re-opened around every piece, and a
+    single line that still doesn't fit is cut, never inside an HTML entity.
+    """
+    open_tag = close_tag = ""
+    if block.startswith("<blockquote>") and block.endswith("</blockquote>"):
+        open_tag, close_tag = "<blockquote>", "</blockquote>"
+        block = block[len(open_tag) : -len(close_tag)]
+    room = limit - len(open_tag) - len(close_tag)
+
+    lines: list[str] = []
+    for line in block.split("\n"):
+        while len(line) > room:
+            cut = room
+            amp = line.rfind("&", 0, cut)
+            if amp > 0 and ";" not in line[amp:cut]:
+                cut = amp
+            lines.append(line[:cut])
+            line = line[cut:]
+        lines.append(line)
+
+    pieces: list[str] = []
+    current: list[str] = []
+    current_len = 0
+    for line in lines:
+        extra = len(line) + (1 if current else 0)
+        if current and current_len + extra > room:
+            pieces.append("\n".join(current))
+            current = []
+            current_len = 0
+            extra = len(line)
+        current.append(line)
+        current_len += extra
+    if current:
+        pieces.append("\n".join(current))
+    return [f"{open_tag}{piece}{close_tag}" for piece in pieces]
+
+
+def chunk_html(blocks: list[str], limit: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """
+    Greedily pack HTML blocks (separated by blank lines) into messages of at
+    most `limit` characters. Blocks are kept whole where they fit, so tags
+    stay balanced; a block longer than `limit` is split by split_html_block.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    current_len = 0
+    for block in _fit_blocks(blocks, limit):
+        extra = len(block) + (2 if current else 0)
+        if current and current_len + extra > limit:
+            chunks.append("\n\n".join(current))
+            current = []
+            current_len = 0
+            extra = len(block)
+        current.append(block)
+        current_len += extra
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _fit_blocks(blocks: list[str], limit: int) -> Iterable[str]:
+    """Yield `blocks`, splitting any longer than `limit` into pieces that fit."""
+    for block in blocks:
+        if len(block) > limit:
+            yield from split_html_block(block, limit)
+        else:
+            yield block
 
-    # Fetch categories and subcategories for department 33
-    categories = ticket_service.fetch_categories_by_department_id(department_id=33)
-    categories_dict = {cat.id: cat.name_ru or f"ID {cat.id}" for cat in categories}
 
-    # Fetch all subcategories for all categories
-    subcategories_dict = {}
-    for category in categories:
-        subcategories = ticket_service.fetch_subcategories_by_category_id(category.id)
-        for subcat in subcategories:
-            subcategories_dict[subcat.id] = subcat.name_ru or f"ID {subcat.id}"
+@ttl_cache(seconds=TICKETS_LIST_CACHE_TTL)
+async def compose_new_tickets_list() -> list[str]:
+    """Detailed HTML list of new tickets in department 33, one block per ticket."""
+    (
+        new_rows,
+        buildings_dict,
+        categories_dict,
+        subcategories_dict,
+    ) = await fetch_tickets_with_references("new")
 
-    def esc(value: str) -> str:
-        s = str(value)
-        s = s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        return s
+    if not new_rows:
+        return ["всего новых заявок: 0"]
 
-    lines = []
-    lines.append(f"всего новых заявок: {len(new_rows)}")
-    lines.append("")
+    blocks = [f"всего новых заявок: {len(new_rows)}"]
 
     # Format each ticket as a quoted block
-    for ticket in new_rows:
+    for row in new_rows:
+        ticket = row.ticket
         ticket_id = ticket.id
         user_id = ticket.user_id
         building_id = ticket.building_id
@@ -367,7 +669,7 @@ def compose_new_tickets_list() -> str:
 
         # Get applicant name
         if user_id:
-            user = users_dict.get(user_id)
+            user = row.user
             if user:
                 applicant_name = user.full_name
             else:
@@ -397,75 +699,39 @@ def compose_new_tickets_list() -> str:
         else:
             building_name = "не указан"
 
-        ticket_lines = [
-            f"Заявка №{esc(ticket_id)}",
-            f"Заявитель: {esc(applicant_name)}",
-            f"Категория: {esc(category_name)}",
-            f"Подкатегория: {esc(subcategory_name)}",
-            f"Контакты: {esc(phone)}",
-            f"Описание: {esc(description)}",
-            f"корпус: {esc(building_name)}",
-            f"Кабинет: {esc(cabinet)}",
-        ]
-
         # Wrap each ticket into HTML blockquote for Telegram
-        lines.append("<blockquote>" + "\n".join(ticket_lines) + "</blockquote>")
-        lines.append("")
-
-    return "\n".join(lines)
-
+        blocks.append(
+            f"<blockquote>Заявка №{esc(ticket_id)}\n"
+            f"Заявитель: {esc(applicant_name)}\n"
+            f"Категория: {esc(category_name)}\n"
+            f"Подкатегория: {esc(subcategory_name)}\n"
+            f"Контакты: {esc(phone)}\n"
+            f"Описание: {esc(description)}\n"
+            f"корпус: {esc(building_name)}\n"
+            f"Кабинет: {esc(cabinet)}</blockquote>"
+        )
 
-def compose_taken_tickets_list() -> str:
+    return blocks
 
-    global ticket_service
-    if ticket_service is None:
-        ticket_service = get_ticket_service()
 
-    taken_rows = ticket_service.fetch_tickets_by_status(
-        status="taken", department_id=33, limit=1000, offset=0
-    )
+@ttl_cache(seconds=TICKETS_LIST_CACHE_TTL)
+async def compose_taken_tickets_list() -> list[str]:
+    """Detailed HTML list of taken tickets in department 33, one block per ticket."""
+    (
+        taken_rows,
+        buildings_dict,
+        categories_dict,
+        subcategories_dict,
+    ) = await fetch_tickets_with_references("taken")
 
     if not taken_rows:
-        return "всего заявок в работе: 0"
-
-    user_ids = set()
-    specialist_ids = set()
-
-    for ticket in taken_rows:
-        user_id = ticket.user_id
-        specialist_id = ticket.specialist_id
-
-        if user_id is not None:
-            user_ids.add(user_id)
-        if specialist_id is not None:
-            specialist_ids.add(specialist_id)
-
-    users_dict = ticket_service.fetch_users_by_ids(list(user_ids | specialist_ids))
-
-    buildings_dict = ticket_service.fetch_building_descriptions()
-
-    # Fetch categories and subcategories for department 33
-    categories = ticket_service.fetch_categories_by_department_id(department_id=33)
-    categories_dict = {cat.id: cat.name_ru or f"ID {cat.id}" for cat in categories}
-
-    # Fetch all subcategories for all categories
-    subcategories_dict = {}
-    for category in categories:
-        subcategories = ticket_service.fetch_subcategories_by_category_id(category.id)
-        for subcat in subcategories:
-            subcategories_dict[subcat.id] = subcat.name_ru or f"ID {subcat.id}"
-
-    def esc(value: str) -> str:
-        s = str(value)
-        s = s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        return s
+        return ["всего заявок в работе: 0"]
 
-    lines = []
-    lines.append(f"всего заявок в работе: {len(taken_rows)}")
-    lines.append("")
+    blocks = [f"всего заявок в работе: {len(taken_rows)}"]
 
     # Format each ticket as a quoted block
-    for ticket in taken_rows:
+    for row in taken_rows:
+        ticket = row.ticket
         ticket_id = ticket.id
         user_id = ticket.user_id
         specialist_id = ticket.specialist_id
@@ -476,7 +742,7 @@ def compose_taken_tickets_list() -> str:
 
         # Get applicant name
         if user_id:
-            user = users_dict.get(user_id)
+            user = row.user
             if user:
                 applicant_name = user.full_name
             else:
@@ -484,9 +750,14 @@ def compose_taken_tickets_list() -> str:
         else:
             applicant_name = "не указан"
 
-        specialist_name = (
-            users_dict.get(specialist_id).full_name if specialist_id else "не указан"
-        )
+        if specialist_id:
+            specialist = row.specialist
+            if specialist:
+                specialist_name = specialist.full_name
+            else:
+                specialist_name = f"ID {specialist_id}"
+        else:
+            specialist_name = "не указан"
 
         # Get category name
         if ticket.category_id:
@@ -510,23 +781,20 @@ def compose_taken_tickets_list() -> str:
         else:
             building_name = "не указан"
 
-        ticket_lines = [
-            f"Заявка №{esc(ticket_id)}",
-            f"Заявитель: {esc(applicant_name)}",
-            f"Категория: {esc(category_name)}",
-            f"Подкатегория: {esc(subcategory_name)}",
-            f"Контакты: {esc(phone)}",
-            f"Описание: {esc(description)}",
-            f"корпус: {esc(building_name)}",
-            f"Кабинет: {esc(cabinet)}",
-            f"Исполнитель: {esc(specialist_name)}",
-        ]
-
         # Wrap each ticket into HTML blockquote for Telegram
-        lines.append("<blockquote>" + "\n".join(ticket_lines) + "</blockquote>")
-        lines.append("")
+        blocks.append(
+            f"<blockquote>Заявка №{esc(ticket_id)}\n"
+            f"Заявитель: {esc(applicant_name)}\n"
+            f"Категория: {esc(category_name)}\n"
+            f"Подкатегория: {esc(subcategory_name)}\n"
+            f"Контакты: {esc(phone)}\n"
+            f"Описание: {esc(description)}\n"
+            f"корпус: {esc(building_name)}\n"
+            f"Кабинет: {esc(cabinet)}\n"
+            f"Исполнитель: {esc(specialist_name)}</blockquote>"
+        )
 
-    return "\n".join(lines)
+    return blocks
 
 
 async def new_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -535,11 +803,8 @@ async def new_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     if chat:
         track_chat_id(chat.id)
     try:
-        text = compose_new_tickets_list()
-        if not text or not text.strip():
-            await update.message.reply_text("всего новых заявок: 0")
-        else:
-            await update.message.reply_text(text, parse_mode="HTML")
+        for chunk in chunk_html(await compose_new_tickets_list()):
+            await update.message.reply_text(chunk, parse_mode="HTML")
     except Exception as e:
         logger.error(f"/new failed: {e}", exc_info=True)
         await update.message.reply_text(
@@ -553,11 +818,8 @@ async def taken_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     if chat:
         track_chat_id(chat.id)
     try:
-        text = compose_taken_tickets_list()
-        if not text or not text.strip():
-            await update.message.reply_text("всего заявок в работе: 0")
-        else:
-            await update.message.reply_text(text, parse_mode="HTML")
+        for chunk in chunk_html(await compose_taken_tickets_list()):
+            await update.message.reply_text(chunk, parse_mode="HTML")
     except Exception as e:
         logger.error(f"/taken failed: {e}", exc_info=True)
         await update.message.reply_text(
@@ -565,6 +827,18 @@ async def taken_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         )
 
 
+async def refresh_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Drop cached reference data and replies so the next request hits the DB."""
+    chat = update.effective_chat
+    if chat:
+        track_chat_id(chat.id)
+    clear_reference_cache()
+    compose_new_tickets_summary.cache_clear()
+    compose_new_tickets_list.cache_clear()
+    compose_taken_tickets_list.cache_clear()
+    await update.message.reply_text("Кэш справочников сброшен.")
+
+
 async def menu_buttons_router(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> None:
@@ -597,6 +871,25 @@ async def echo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text(update.message.text)
 
 
+async def edit_with_html_chunks(query: CallbackQuery, chunks: list[str]) -> None:
+    """
+    Show the first chunk in place of the menu message and send the rest as new
+    messages, in order. The inline menu is attached to the last message.
+    """
+    last = len(chunks) - 1
+    await query.edit_message_text(
+        text=chunks[0],
+        parse_mode="HTML",
+        reply_markup=get_main_inline_keyboard() if last == 0 else None,
+    )
+    for idx, chunk in enumerate(chunks[1:], start=1):
+        await query.message.reply_text(
+            chunk,
+            parse_mode="HTML",
+            reply_markup=get_main_inline_keyboard() if idx == last else None,
+        )
+
+
 async def on_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle inline keyboard callback queries for the main menu."""
     query = update.callback_query
@@ -608,12 +901,8 @@ async def on_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
     if data == "menu:new":
         try:
-            text = compose_new_tickets_list()
-            msg_text = text if text and text.strip() else "всего новых заявок: 0"
-            await query.edit_message_text(
-                text=msg_text,
-                parse_mode="HTML",
-                reply_markup=get_main_inline_keyboard(),
+            await edit_with_html_chunks(
+                query, chunk_html(await compose_new_tickets_list())
             )
         except Exception:
             await query.edit_message_text(
@@ -622,12 +911,8 @@ async def on_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             )
     elif data == "menu:taken":
         try:
-            text = compose_taken_tickets_list()
-            msg_text = text if text and text.strip() else "всего заявок в работе: 0"
-            await query.edit_message_text(
-                text=msg_text,
-                parse_mode="HTML",
-                reply_markup=get_main_inline_keyboard(),
+            await edit_with_html_chunks(
+                query, chunk_html(await compose_taken_tickets_list())
             )
         except Exception:
             await query.edit_message_text(
@@ -636,11 +921,12 @@ async def on_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             )
     elif data == "menu:status":
         try:
-            text = compose_new_tickets_summary()
-            msg_text = text if text and text.strip() else "No tickets found."
+            text, entities = await compose_new_tickets_summary()
+            if not text or not text.strip():
+                text, entities = "No tickets found.", ()
             await query.edit_message_text(
-                text=msg_text,
-                parse_mode="Markdown",
+                text=text,
+                entities=entities,
                 reply_markup=get_main_inline_keyboard(),
             )
         except Exception:
@@ -652,6 +938,30 @@ async def on_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         await query.edit_message_reply_markup(reply_markup=get_main_inline_keyboard())
 
 
+async def on_startup(application: Application) -> None:
+    """Warn if the tickets table lacks the indexes the summary queries rely on."""
+    try:
+        missing = await asyncio.to_thread(lambda: _svc().missing_indexes())
+    except Exception as e:
+        logger.warning(f"Could not check ticket table indexes: {e}")
+        return
+    if missing:
+        logger.warning(
+            f"Tickets table is missing indexes {', '.join(missing)}; "
+            "see SCHEMA.sql or run get_ticket_service().ensure_indexes()"
+        )
+
+
+async def on_shutdown(application: Application) -> None:
+    """
+    Compact the chat IDs log so the next start replays one record per chat,
+    and close the DB pool's connections.
+    """
+    save_chat_ids(tracked_chat_ids)
+    if _svc.cache_info().currsize:
+        await asyncio.to_thread(_svc().close)
+
+
 async def chat_member_handler(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> None:
@@ -667,14 +977,25 @@ async def chat_member_handler(
 
 def main() -> None:
     """Start the bot."""
+    bot_token = _bootstrap()
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+
     # Create the Application with increased timeout settings
     application = (
         Application.builder()
-        .token(BOT_TOKEN)
+        .token(bot_token)
         .connect_timeout(60.0)  # Increase connection timeout to 60s
         .read_timeout(60.0)  # Increase read timeout to 60s
         .write_timeout(60.0)  # Increase write timeout to 60s
         .pool_timeout(60.0)  # Increase pool timeout to 60s
+        # Throttle outgoing requests and retry 429s instead of failing sends;
+        # the defaults already match Telegram's limits (30 msg/s bot-wide,
+        # 20 msg/min per group)
+        .rate_limiter(AIORateLimiter(max_retries=3))
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
         .build()
     )
 
@@ -686,6 +1007,8 @@ def main() -> None:
     application.add_handler(CommandHandler("ticket", tickets))  # alias
     application.add_handler(CommandHandler("new", new_command))
     application.add_handler(CommandHandler("taken", taken_command))
+    application.add_handler(CommandHandler("refresh", refresh_command))
+    application.add_handler(CommandHandler("refresh_cache", refresh_command))  # alias
 
     # Track chats when bot member status changes (e.g., added to groups)
     application.add_handler(
@@ -697,7 +1020,7 @@ def main() -> None:
         MessageHandler(
             filters.TEXT
             & ~filters.COMMAND
-            & (filters.Regex("(?i)^(Новые|В работе|Статус)$")),
+            & filters.Text(["Новые", "В работе", "Статус"]),
             menu_buttons_router,
         )
     )
@@ -709,67 +1032,98 @@ def main() -> None:
     # Schedule daily announcements of new tickets (Astana time)
     async def send_new_tickets_job(context: ContextTypes.DEFAULT_TYPE) -> None:
         try:
-            now_astana_dt = datetime.datetime.now(ASTANA_TZ)
+            now_astana_dt = datetime.datetime.now(astana_tz())
             now_astana = now_astana_dt.strftime("%Y-%m-%d %H:%M:%S %Z")
             logger.info(f"Executing scheduled send at {now_astana}")
 
-            # Reload chat IDs from file in case they were updated
-            global tracked_chat_ids
-            tracked_chat_ids = load_chat_ids()
-
+            reload_chat_ids_if_changed()
             if not tracked_chat_ids:
                 logger.warning("No tracked chat IDs found. Skipping scheduled send.")
                 return
 
-            text = compose_new_tickets_summary()
-            successful_sends = 0
-            failed_sends = 0
+            # Compose fresh data once and reuse it for every chat
+            compose_new_tickets_summary.cache_clear()
+            text, entities = await compose_new_tickets_summary()
+            chat_ids = list(tracked_chat_ids)
+            send_limit = asyncio.Semaphore(BROADCAST_CONCURRENCY)
 
-            for (
-                chat_id
-            ) in (
-                tracked_chat_ids.copy()
-            ):  # Use copy to avoid modification during iteration
-                try:
+            async def send_to_chat(chat_id: int) -> None:
+                async with send_limit:
                     await context.bot.send_message(
-                        chat_id=chat_id, text=text, parse_mode="Markdown"
+                        chat_id=chat_id, text=text, entities=entities
                     )
+
+            results = await asyncio.gather(
+                *(send_to_chat(chat_id) for chat_id in chat_ids),
+                return_exceptions=True,
+            )
+
+            successful_sends = 0
+            failed_sends = 0
+            dead: set[int] = set()
+            for chat_id, result in zip(chat_ids, results):
+                if result is None:
                     successful_sends += 1
-                    logger.info(
-                        f"Successfully sent scheduled message to chat {chat_id}"
-                    )
-                except TelegramError as e:
+                    logger.debug("Sent scheduled message to chat %s", chat_id)
+                elif isinstance(result, TelegramError):
                     failed_sends += 1
-                    error_msg = str(e).lower()
-                    # Remove chat ID if bot was removed or chat doesn't exist
-                    if (
-                        "chat not found" in error_msg
-                        or "bot was blocked" in error_msg
-                        or "unauthorized" in error_msg
+                    # Remove chat ID if bot was blocked/kicked or chat doesn't exist
+                    if isinstance(result, Forbidden) or (
+                        isinstance(result, BadRequest)
+                        and "chat not found" in result.message.lower()
                     ):
-                        tracked_chat_ids.discard(chat_id)
-                        save_chat_ids(tracked_chat_ids)
+                        dead.add(chat_id)
                         logger.warning(
-                            f"Removed chat {chat_id} from tracked chats: {e}"
+                            "Removing chat %s from tracked chats: %s", chat_id, result
                         )
                     else:
-                        logger.error(f"Failed to send to chat {chat_id}: {e}")
-                except Exception as e:
+                        logger.error("Failed to send to chat %s: %s", chat_id, result)
+                else:
                     failed_sends += 1
-                    logger.error(f"Unexpected error sending to chat {chat_id}: {e}")
+                    logger.error(
+                        "Unexpected error sending to chat %s: %s", chat_id, result
+                    )
+
+            if dead:
+                tracked_chat_ids.difference_update(dead)
+                append_chat_ids_ops("remove", dead)
+                logger.warning("Pruned %d dead chats", len(dead))
 
             logger.info(
-                f"Scheduled send completed: {successful_sends} successful, {failed_sends} failed out of {len(tracked_chat_ids)} total chats"
+                "Scheduled send completed: %d successful, %d failed out of %d total chats",
+                successful_sends,
+                failed_sends,
+                len(chat_ids),
             )
         except Exception as e:
             logger.error(f"Scheduled send job failed: {e}", exc_info=True)
 
-    times = [
-        datetime.time(8, 30, tzinfo=ASTANA_TZ),
-        datetime.time(12, 0, tzinfo=ASTANA_TZ),
-        datetime.time(15, 0, tzinfo=ASTANA_TZ),
-        datetime.time(17, 25, tzinfo=ASTANA_TZ),
-    ]
+    def schedule_next_broadcast(job_queue: JobQueue, after: datetime.datetime) -> None:
+        """Arm the broadcast job for the first slot after `after`."""
+        when = next_broadcast_at(after)
+        job_queue.run_once(
+            broadcast_and_reschedule,
+            when=when,
+            data=when,
+            name="send_new_tickets",
+            # APScheduler drops a job that fires over 1s late (host suspend,
+            # clock step, stalled loop) without calling it, which would end
+            # the chain; run a late slot whenever it gets the chance instead
+            job_kwargs={"misfire_grace_time": None},
+        )
+        logger.info(f"Next scheduled send at {when:%Y-%m-%d %H:%M %Z}")
+
+    async def broadcast_and_reschedule(context: ContextTypes.DEFAULT_TYPE) -> None:
+        # A single run_once job chained from slot to slot instead of one
+        # always-armed daily trigger per slot; job.data is the slot that fired
+        try:
+            await send_new_tickets_job(context)
+        finally:
+            # From now if the slot ran late, so missed slots aren't replayed
+            after = max(context.job.data, datetime.datetime.now(tz))
+            schedule_next_broadcast(context.job_queue, after)
+
+    tz = astana_tz()
 
     # Check if job_queue is available
     if application.job_queue is None:
@@ -778,32 +1132,20 @@ def main() -> None:
             "pip install 'python-telegram-bot[job-queue]'"
         )
     else:
-        logger.info(f"JobQueue is available. Scheduling {len(times)} daily jobs...")
-        for idx, t in enumerate(times):
-            try:
-                logger.info(
-                    f"Scheduling job 'send_new_tickets_{idx}' for {t.strftime('%H:%M')} {t.tzname()}"
-                )
-                application.job_queue.run_daily(
-                    send_new_tickets_job,
-                    time=t,
-                    name=f"send_new_tickets_{idx}",
-                    # В PTB v20+ days выровнен с datetime.weekday():
-                    # 0 = понедельник, 6 = воскресенье. Нам нужны будни (пн–пт).
-                    days=(0, 1, 2, 3, 4),
-                )
-                logger.info(f"Successfully scheduled job 'send_new_tickets_{idx}'")
-            except Exception as e:
-                logger.error(
-                    f"Failed to schedule job 'send_new_tickets_{idx}': {e}",
-                    exc_info=True,
-                )
+        slots = ", ".join(t.strftime("%H:%M") for t in BROADCAST_TIMES)
+        logger.info(f"JobQueue is available. Scheduling sends at {slots} {tz}...")
+        try:
+            schedule_next_broadcast(application.job_queue, datetime.datetime.now(tz))
+        except Exception as e:
+            logger.error(
+                f"Failed to schedule job 'send_new_tickets': {e}", exc_info=True
+            )
 
     # Start the bot with error handling
     logger.info("Bot is starting...")
     logger.info(f"ANNOUNCE_CHAT_ID: {ANNOUNCE_CHAT_ID}")
     logger.info(f"Tracked chat IDs: {len(tracked_chat_ids)} chats")
-    logger.info(f"Timezone: {ASTANA_TZ}")
+    logger.info(f"Timezone: {tz}")
 
     # Verify job queue before starting
     if application.job_queue is not None:
@@ -813,7 +1155,12 @@ def main() -> None:
 
     try:
         application.run_polling(
-            allowed_updates=Update.ALL_TYPES, drop_pending_updates=True
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=True,
+            # Long polling: Telegram holds each getUpdates open for up to 30s
+            # until an update arrives, instead of answering empty every 10s
+            timeout=30,
+            poll_interval=0.0,
         )
     except (TimedOut, NetworkError) as e:
         logger.error(f"Connection timeout/error: {e}")
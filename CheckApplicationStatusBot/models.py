@@ -5,13 +5,17 @@ This module defines the structure of objects representing database tables:
 - Ticket: Represents a ticket/request from the tickets table
 - User: Represents a user from the users table
 - Building: Represents a building from the buildings table
+- TicketWithUsers: A ticket joined with its applicant and specialist
+- TicketStat: Represents one aggregated row of ticket counts
+
+Instances are frozen: the service caches and shares them between callers.
 """
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Any, Optional, Sequence
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Ticket:
     """Represents a ticket/request entry."""
 
@@ -30,22 +34,19 @@ class Ticket:
     @classmethod
     def from_dict(cls, data: dict) -> "Ticket":
         """Create a Ticket instance from a dictionary (e.g., from database query)."""
-        return cls(
-            id=data.get("id"),
-            user_id=data.get("user_id"),
-            specialist_id=data.get("specialist_id"),
-            building_id=data.get("building_id"),
-            description=data.get("description"),
-            title=data.get("title"),
-            cabinet=data.get("cabinet"),
-            status=data.get("status"),
-            department_id=data.get("department_id"),
-            category_id=data.get("category_id"),
-            subcategory_id=data.get("subcategory_id"),
-        )
-
-
-@dataclass
+        return cls(*map(data.get, _TICKET_KEYS))
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Ticket":
+        """Create a Ticket instance from a tuple row holding every field in order."""
+        return cls(*row)
+
+
+# Row keys in field order, so from_dict can pass the values positionally
+_TICKET_KEYS = tuple(f.name for f in fields(Ticket))
+
+
+@dataclass(slots=True, frozen=True)
 class User:
     """Represents a user entry."""
 
@@ -57,12 +58,12 @@ class User:
     @classmethod
     def from_dict(cls, data: dict) -> "User":
         """Create a User instance from a dictionary (e.g., from database query)."""
-        return cls(
-            id=data.get("id"),
-            firstname=data.get("firstname"),
-            lastname=data.get("lastname"),
-            phone=data.get("phone"),
-        )
+        return cls(*map(data.get, _USER_KEYS))
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "User":
+        """Create a User instance from a tuple row holding every field in order."""
+        return cls(*row)
 
     @property
     def full_name(self) -> str:
@@ -71,7 +72,10 @@ class User:
         return name if name else f"ID {self.id}"
 
 
-@dataclass
+_USER_KEYS = tuple(f.name for f in fields(User))
+
+
+@dataclass(slots=True, frozen=True)
 class Building:
     """Represents a building entry."""
 
@@ -82,11 +86,7 @@ class Building:
     @classmethod
     def from_dict(cls, data: dict) -> "Building":
         """Create a Building instance from a dictionary (e.g., from database query)."""
-        return cls(
-            id=data.get("id"),
-            name=data.get("name"),
-            description=data.get("description"),
-        )
+        return cls(*map(data.get, _BUILDING_KEYS))
 
     @property
     def display_name(self) -> str:
@@ -94,7 +94,10 @@ class Building:
         return self.description or self.name or str(self.id)
 
 
-@dataclass
+_BUILDING_KEYS = tuple(f.name for f in fields(Building))
+
+
+@dataclass(slots=True, frozen=True)
 class Category:
     """Represents a category entry."""
 
@@ -105,14 +108,18 @@ class Category:
     @classmethod
     def from_dict(cls, data: dict) -> "Category":
         """Create a Category instance from a dictionary (e.g., from database query)."""
-        return cls(
-            id=data.get("id"),
-            department_id=data.get("department_id"),
-            name_ru=data.get("name_ru"),
-        )
+        return cls(*map(data.get, _CATEGORY_KEYS))
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Category":
+        """Create a Category instance from a tuple row holding every field in order."""
+        return cls(*row)
 
 
-@dataclass
+_CATEGORY_KEYS = tuple(f.name for f in fields(Category))
+
+
+@dataclass(slots=True, frozen=True)
 class SubCategory:
     """Represents a sub-category entry."""
 
@@ -123,8 +130,74 @@ class SubCategory:
     @classmethod
     def from_dict(cls, data: dict) -> "SubCategory":
         """Create a SubCategory instance from a dictionary (e.g., from database query)."""
-        return cls(
-            id=data.get("id"),
-            category_id=data.get("category_id"),
-            name_ru=data.get("name_ru"),
-        )
+        return cls(*map(data.get, _SUBCATEGORY_KEYS))
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "SubCategory":
+        """Create a SubCategory instance from a tuple row holding every field in order."""
+        return cls(*row)
+
+
+_SUBCATEGORY_KEYS = tuple(f.name for f in fields(SubCategory))
+
+
+@dataclass(slots=True, frozen=True)
+class TicketStat:
+    """Represents a ticket count for one (status, building, specialist) group."""
+
+    status: str
+    building_id: Optional[int]
+    specialist_id: Optional[int]
+    specialist_firstname: Optional[str]
+    specialist_lastname: Optional[str]
+    building_description: Optional[str]
+    count: int
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "TicketStat":
+        """Create a TicketStat instance from a tuple row holding every field in order."""
+        return cls(*row)
+
+    @property
+    def specialist_name(self) -> str:
+        """Returns the specialist's full name, or 'ID {specialist_id}' if not available."""
+        name = f"{self.specialist_firstname or ''} {self.specialist_lastname or ''}".strip()
+        return name if name else f"ID {self.specialist_id}"
+
+    @property
+    def building_label(self) -> str:
+        """
+        Returns the building's label (description, else name; see
+        fetch_ticket_stats) if available, otherwise building id as string.
+        """
+        return self.building_description or str(self.building_id)
+
+
+@dataclass(slots=True, frozen=True)
+class TicketWithUsers:
+    """A ticket with its applicant and specialist."""
+
+    ticket: Ticket
+    user: Optional[User]
+    specialist: Optional[User]
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "TicketWithUsers":
+        """
+        Create a TicketWithUsers from one joined row holding the Ticket, applicant
+        and specialist fields in field order. A user whose id is NULL (no LEFT
+        JOIN match) becomes None.
+        """
+        values = []
+        start = 0
+        for model, width in _TICKET_WITH_USERS_WIDTHS:
+            part = row[start : start + width]
+            start += width
+            values.append(model.from_row(part) if part[0] is not None else None)
+        return cls(*values)
+
+
+# (model, column count) of each TicketWithUsers part, in row order
+_TICKET_WITH_USERS_WIDTHS = tuple(
+    (model, len(fields(model))) for model in (Ticket, User, User)
+)
@@ -0,0 +1,89 @@
+import asyncio
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, Tuple, Union
+
+
+def ttl_cache(seconds: Union[float, Callable[[], float]] = 300.0) -> Callable:
+    """
+    Memoize a function's result per argument tuple for `seconds`.
+    `seconds` may also be a zero-argument callable, read whenever an entry is
+    stored, for TTLs that are only known once configuration has been loaded.
+    Works for both plain and async functions (the awaited result is cached).
+    For async functions, concurrent callers that miss the cache share a single
+    in-flight call instead of each hitting the backend.
+    The wrapped function gets a `cache_clear()` method to drop all entries;
+    calls already running when it is called don't store their (stale) result,
+    and later callers don't join them.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        entries: Dict[Tuple[Any, ...], Tuple[Any, float]] = {}
+        # Bumped by cache_clear; a call only stores if it is still current
+        generation = [0]
+
+        def lookup(args: Tuple[Any, ...]) -> Tuple[bool, Any]:
+            cached = entries.get(args)
+            if cached is not None and time.monotonic() < cached[1]:
+                return True, cached[0]
+            return False, None
+
+        def store(args: Tuple[Any, ...], value: Any, started: int) -> None:
+            if started != generation[0]:
+                return
+            ttl = seconds() if callable(seconds) else seconds
+            entries[args] = (value, time.monotonic() + ttl)
+
+        if inspect.iscoroutinefunction(func):
+            in_flight: Dict[Tuple[Any, ...], asyncio.Future] = {}
+
+            async def fill(args: Tuple[Any, ...]) -> Any:
+                started = generation[0]
+                value = await func(*args)
+                store(args, value, started)
+                return value
+
+            def forget(args: Tuple[Any, ...], task: asyncio.Future) -> None:
+                # A call started after cache_clear may own the slot by now
+                if in_flight.get(args) is task:
+                    del in_flight[args]
+
+            def cache_clear() -> None:
+                generation[0] += 1
+                entries.clear()
+                in_flight.clear()
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any) -> Any:
+                hit, value = lookup(args)
+                if hit:
+                    return value
+                task = in_flight.get(args)
+                if task is None:
+                    task = asyncio.ensure_future(fill(args))
+                    in_flight[args] = task
+                    task.add_done_callback(lambda done: forget(args, done))
+                # Shield so one cancelled caller doesn't cancel the shared call
+                return await asyncio.shield(task)
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args: Any) -> Any:
+                hit, value = lookup(args)
+                if hit:
+                    return value
+                started = generation[0]
+                value = func(*args)
+                store(args, value, started)
+                return value
+
+            def cache_clear() -> None:
+                generation[0] += 1
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
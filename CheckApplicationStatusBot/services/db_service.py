@@ -1,26 +1,114 @@
+import logging
 import os
-from typing import Any, Dict, List, Tuple, Optional
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import fields
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from dotenv import load_dotenv
-from mysql.connector import connect
+from mysql.connector import Error, connect
 from mysql.connector import pooling
 from mysql.connector.connection import MySQLConnection
 
-from models import Ticket, User, Building, Category, SubCategory
+from models import (
+    Ticket,
+    User,
+    Category,
+    SubCategory,
+    TicketStat,
+    TicketWithUsers,
+)
+
+logger = logging.getLogger(__name__)
 
 # taken - status for active tickets
-# Load environment variables (safe if already loaded elsewhere)
-load_dotenv()
+
+# Reference tables (buildings, categories, subcategories) change rarely; their
+# rows are cached for this many seconds unless REFDATA_TTL_SECONDS overrides it
+REFDATA_TTL_SECONDS = 300.0
+
+# Upper bound on the rows one reference-data fetch loads, so a runaway table
+# can't pull an unbounded result into memory
+REFERENCE_ROW_LIMIT = 10_000
+
+# Most category ids bound into one IN (...) list; longer lists are split so a
+# query stays well under max_allowed_packet
+SUBCATEGORY_ID_CHUNK = 1000
+
+# A building's display label: description, else name, else the id. Format with
+# the table alias prefix ("b.") or "" when the buildings table is not aliased;
+# Building.display_name applies the same order
+_BUILDING_LABEL = (
+    "COALESCE(NULLIF({0}description, ''), NULLIF({0}name, ''), CAST({0}id AS CHAR))"
+)
+
+# Columns each model is built from; selected instead of * so unused (and
+# possibly wide) columns of the tables never leave the server. They are in
+# field order, so rows come back as plain tuples for Model.from_row
+TICKET_COLUMNS: Tuple[str, ...] = tuple(f.name for f in fields(Ticket))
+USER_COLUMNS: Tuple[str, ...] = tuple(f.name for f in fields(User))
+CATEGORY_COLUMNS: Tuple[str, ...] = tuple(f.name for f in fields(Category))
+SUBCATEGORY_COLUMNS: Tuple[str, ...] = tuple(f.name for f in fields(SubCategory))
+
+# Unquoted MySQL identifier: ASCII word characters, not starting with a digit,
+# at most 64 long
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{0,63}")
+
+# Indexes the queries below rely on (name -> columns); see SCHEMA.sql.
+# (department_id, status, building_id, specialist_id) covers fetch_ticket_stats,
+# so its counts never read ticket rows. (department_id, status, id) serves the
+# ticket pages: equality on the first two columns, then a reverse scan of id for
+# ORDER BY id DESC, with no filesort.
+TICKET_INDEXES: Dict[str, Tuple[str, ...]] = {
+    "idx_tickets_dept_status_bldg_spec": (
+        "department_id",
+        "status",
+        "building_id",
+        "specialist_id",
+    ),
+    "idx_tickets_dept_status_id": ("department_id", "status", "id"),
+}
 
 
 class MySQLTicketService:
+    """
+    Read-only access to the helpdesk tables. Pooled connections are handed
+    back without a session reset, so methods must leave no session state
+    behind: no temporary tables, user variables or session settings. Sessions
+    run with autocommit on, so a SELECT never leaves a transaction open; a
+    method must not start one explicitly (BEGIN/START TRANSACTION) unless it
+    commits or rolls back before releasing the connection. ensure_indexes()
+    is the one writer, and its DDL commits implicitly.
+    """
 
-    def __init__(self, pool_name: str = "tickets_pool", pool_size: int = 5) -> None:
+    def __init__(
+        self, pool_name: str = "tickets_pool", pool_size: Optional[int] = None
+    ) -> None:
+        # Load environment variables (safe if already loaded elsewhere)
+        load_dotenv()
         self.db_host: str = os.getenv("DB_HOST", "localhost")
         self.db_port: int = int(os.getenv("DB_PORT", "3306"))
         self.db_user: str = os.getenv("DB_USER", "root")
         self.db_password: str = os.getenv("DB_PASSWORD", "")
         self.db_name: str = os.getenv("DB_NAME", "")
+        if pool_size is None:
+            # Enough for concurrent handlers plus the broadcast job's queries
+            pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
         self.tickets_table: str = os.getenv("TICKETS_TABLE_NAME", "DB_TICKETS")
         self.buildings_table: str = os.getenv("BUILDINGS_TABLE_NAME", "cat_building")
         self.users_table: str = os.getenv("USERS_TABLE_NAME", "users")
@@ -40,6 +128,10 @@ class MySQLTicketService:
             raise ValueError(
                 "BUILDINGS_TABLE_NAME contains invalid characters. Allowed: letters, digits, underscore."
             )
+        if not self._is_safe_identifier(self.users_table):
+            raise ValueError(
+                "USERS_TABLE_NAME contains invalid characters. Allowed: letters, digits, underscore."
+            )
         if not self._is_safe_identifier(self.categories_table):
             raise ValueError(
                 "CATEGORIES_TABLE_NAME contains invalid characters. Allowed: letters, digits, underscore."
@@ -52,59 +144,318 @@ class MySQLTicketService:
         if not self.db_name:
             raise ValueError("DB_NAME is not set in environment variables")
 
-        self.pool: pooling.MySQLConnectionPool = pooling.MySQLConnectionPool(
+        # The pool opens its connections when created, so that waits for first use
+        self._pool: Optional[pooling.MySQLConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # Set by close(); a closed service never builds a new pool
+        self._closed = False
+        self._pool_config: Dict[str, Any] = dict(
             pool_name=pool_name,
             pool_size=pool_size,
-            pool_reset_session=True,
+            # A session reset costs a round-trip per released connection and
+            # would drop the statements prepared on it; the service is
+            # read-only (see the class docstring), so there is nothing to reset
+            pool_reset_session=False,
+            # Connector opens sessions with autocommit off, so the first SELECT
+            # would start a REPEATABLE READ transaction that nothing ends (no
+            # reset on release); every later query on that connection would
+            # then read the same stale snapshot
+            autocommit=True,
             host=self.db_host,
             port=self.db_port,
             user=self.db_user,
             password=self.db_password,
             database=self.db_name,
         )
+        # pooled connection -> (session id, {(SQL text, dictionary) -> prepared
+        # cursor}); statements live per session. Keyed by the pool's own
+        # connection objects, so the map never outgrows the pool
+        self._prepared: Dict[Any, Tuple[int, Dict[Tuple[str, bool], Any]]] = {}
+        self._prepared_lock = threading.Lock()
+        # Connection pinned by session() for the current thread, if any
+        self._local = threading.local()
+        # Reference data cache: key -> (expires_at, immutable value)
+        self.refdata_ttl: float = float(
+            os.getenv("REFDATA_TTL_SECONDS", REFDATA_TTL_SECONDS)
+        )
+        self._refdata: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+        self._refdata_lock = threading.Lock()
+
+    @property
+    def pool(self) -> pooling.MySQLConnectionPool:
+        """The connection pool, created (and connected) on first use."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._closed:
+                    raise RuntimeError("MySQLTicketService is closed")
+                if self._pool is None:
+                    self._pool = pooling.MySQLConnectionPool(**self._pool_config)
+        return self._pool
 
     def _get_connection(self) -> MySQLConnection:
         return self.pool.get_connection()
 
-    def fetch_building_descriptions(self) -> Dict[str, str]:
+    def close(self) -> None:
+        """
+        Close the pool's idle connections for a clean shutdown. Connections
+        still checked out are not touched. Afterwards the service is closed:
+        queries needing a new connection raise RuntimeError instead of
+        quietly opening another pool.
+        """
+        with self._pool_lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool._remove_connections()
+        with self._prepared_lock:
+            self._prepared.clear()
+
+    @contextmanager
+    def session(self) -> Iterator["MySQLTicketService"]:
+        """
+        Run every query issued from this thread inside the block on ONE pooled
+        connection instead of checking one out per query:
+
+            with svc.session() as sess:
+                categories = sess.fetch_categories_by_department_id(33)
+                tickets = sess.fetch_tickets_with_users()
+
+        Nested sessions share the outer connection. A streaming iter_* result
+        must be exhausted before the next query in the same session.
+        """
+        if getattr(self._local, "connection", None) is not None:
+            yield self
+            return
+        connection = self._get_connection()
+        self._local.connection = connection
+        try:
+            yield self
+        finally:
+            self._local.connection = None
+            connection.close()
+
+    @contextmanager
+    def _connection(self) -> Iterator[MySQLConnection]:
+        """The session's connection, or a pooled one returned after the block."""
+        pinned = getattr(self._local, "connection", None)
+        if pinned is not None:
+            yield pinned
+            return
+        connection = self._get_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def fetch_building_descriptions(
+        self, limit: int = REFERENCE_ROW_LIMIT
+    ) -> Mapping[str, str]:
         """
         Return mapping of building id (as string) -> description from cat_building table.
-        If description is NULL or empty, falls back to building name or id string.
+        Empty or NULL descriptions fall back to the building name, then the id.
+        At most `limit` buildings (lowest ids first); use iter_building_descriptions
+        to walk all of them. Cached as reference data (see
+        invalidate_reference_data); read-only.
         """
-        query = f"SELECT id, description, name FROM {self.buildings_table}"
-        rows = self._execute_query(query, tuple())
-        id_to_desc: Dict[str, str] = {}
-        for row in rows:
-            bid = row.get("id")
-            # Prefer description, then name, then id string
-            desc = row.get("description")
-            if bid is not None:
-                id_to_desc[str(bid)] = str(desc) if desc is not None else str(bid)
-        return id_to_desc
+        return self._reference_data(
+            ("buildings", limit), lambda: self._load_building_descriptions(limit)
+        )
+
+    def _load_building_descriptions(self, limit: int) -> Mapping[str, str]:
+        # Both columns arrive as strings, the fallbacks already applied
+        query = (
+            f"SELECT CAST(id AS CHAR), {_BUILDING_LABEL.format('')}"
+            f" FROM {self.buildings_table}"
+            " WHERE id IS NOT NULL ORDER BY id LIMIT %s"
+        )
+        descriptions = dict(self._iter_query(query, (limit,)))
+        if len(descriptions) >= limit:
+            logger.warning(
+                f"{self.buildings_table} reached the {limit}-row limit; buildings"
+                " past it are shown by id (raise the limit or use"
+                " iter_building_descriptions)"
+            )
+        return MappingProxyType(descriptions)
+
+    def iter_building_descriptions(
+        self, batch_size: int = 1000
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (building id as string, description) for every building, a page
+        of `batch_size` at a time (keyset on id, so each page is an index seek).
+        Not cached.
+        """
+        last_id: Optional[int] = None
+        while True:
+            params: Tuple[Any, ...] = ()
+            seek = "id IS NOT NULL"
+            if last_id is not None:
+                seek = "id > %s"
+                params = (last_id,)
+            query = (
+                f"SELECT id, CAST(id AS CHAR), {_BUILDING_LABEL.format('')}"
+                f" FROM {self.buildings_table} WHERE {seek} ORDER BY id LIMIT %s"
+            )
+            rows = self._execute_query_tuples(
+                query, params + (batch_size,), prepared=True
+            )
+            for _, bid, label in rows:
+                yield bid, label
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def invalidate_reference_data(self) -> None:
+        """Drop all cached buildings, categories and subcategories."""
+        with self._refdata_lock:
+            self._refdata.clear()
+
+    def _reference_data(self, key: Tuple[Any, ...], load: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, calling `load` once it has expired."""
+        with self._refdata_lock:
+            cached = self._refdata.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+        value = load()
+        with self._refdata_lock:
+            self._refdata[key] = (time.monotonic() + self.refdata_ttl, value)
+        return value
 
     def fetch_tickets_by_status(
         self,
         status: str = "new",
         department_id: int = 33,
         limit: int = 100,
-        offset: int = 0,
+        before_id: Optional[int] = None,
+        columns: Tuple[str, ...] = TICKET_COLUMNS,
     ) -> List[Ticket]:
+        """
+        Return up to `limit` tickets, newest first. To get the next page pass
+        the id of the last ticket returned as `before_id` (keyset pagination:
+        idx_tickets_dept_status_id seeks straight to it instead of skipping
+        OFFSET rows).
+        Only `columns` are selected (Ticket fields left out are None); pass
+        ("*",) to select everything.
+        """
+        select = self._select_list(columns)
+        params: Tuple[Any, ...] = (status, department_id)
+        seek = ""
+        if before_id is not None:
+            seek = " AND id < %s"
+            params += (before_id,)
         query = (
-            f"SELECT * FROM {self.tickets_table} WHERE `status` = %s AND department_id = %s"
-            " ORDER BY id DESC LIMIT %s OFFSET %s"
+            f"SELECT {select} FROM {self.tickets_table}"
+            f" WHERE `status` = %s AND department_id = %s{seek} ORDER BY id DESC LIMIT %s"
         )
-        params: Tuple[Any, ...] = (status, department_id, limit, offset)
-        rows = self._execute_query(query, params)
+        params += (limit,)
+        if columns == TICKET_COLUMNS:
+            rows = self._execute_query_tuples(query, params, prepared=True)
+            return [Ticket.from_row(row) for row in rows]
+        rows = self._execute_query(query, params, prepared=True)
         return [Ticket.from_dict(row) for row in rows]
 
+    def iter_tickets_by_status(
+        self,
+        status: str = "new",
+        department_id: int = 33,
+        batch_size: int = 500,
+        columns: Tuple[str, ...] = TICKET_COLUMNS,
+    ) -> Iterator[Ticket]:
+        """
+        Yield every ticket with the given status, newest first. Rows are
+        streamed from an unbuffered cursor `batch_size` at a time, so memory
+        stays bounded however many tickets match. The pooled connection is held
+        until the generator is exhausted or closed.
+        """
+        query = (
+            f"SELECT {self._select_list(columns)} FROM {self.tickets_table}"
+            " WHERE `status` = %s AND department_id = %s ORDER BY id DESC"
+        )
+        params: Tuple[Any, ...] = (status, department_id)
+        if columns == TICKET_COLUMNS:
+            for row in self._stream_query(query, params, batch_size, dictionary=False):
+                yield Ticket.from_row(row)
+        else:
+            for row in self._stream_query(query, params, batch_size):
+                yield Ticket.from_dict(row)
+
+    def fetch_tickets_with_users(
+        self,
+        status: str = "new",
+        department_id: int = 33,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+    ) -> List[TicketWithUsers]:
+        """
+        Like fetch_tickets_by_status, but each ticket comes with its applicant
+        and specialist LEFT JOINed in the same query, so a page of tickets and
+        its users take one round-trip. Buildings and categories are left to the
+        cached reference data.
+        """
+        select = ", ".join(
+            [
+                self._select_list(TICKET_COLUMNS, "t"),
+                self._select_list(USER_COLUMNS, "u"),
+                self._select_list(USER_COLUMNS, "s"),
+            ]
+        )
+        params: Tuple[Any, ...] = (status, department_id)
+        seek = ""
+        if before_id is not None:
+            seek = " AND t.id < %s"
+            params += (before_id,)
+        query = (
+            f"SELECT {select} FROM {self.tickets_table} t"
+            f" LEFT JOIN {self.users_table} u ON u.id = t.user_id"
+            f" LEFT JOIN {self.users_table} s ON s.id = t.specialist_id"
+            f" WHERE t.`status` = %s AND t.department_id = %s{seek}"
+            " ORDER BY t.id DESC LIMIT %s"
+        )
+        params += (limit,)
+        rows = self._execute_query_tuples(query, params, prepared=True)
+        return [TicketWithUsers.from_row(row) for row in rows]
+
+    def fetch_ticket_stats(
+        self,
+        department_id: int = 33,
+        statuses: Tuple[str, ...] = ("available", "new", "taken"),
+    ) -> List[TicketStat]:
+        """
+        Count tickets per (status, building, specialist) in one query, joined
+        with the specialist's name and the building's label (description,
+        else name, else id; NULL when the building is missing).
+        """
+        # Served by idx_tickets_dept_status_bldg_spec (TICKET_INDEXES, SCHEMA.sql),
+        # which covers the WHERE and GROUP BY: an index range scan, no table rows.
+        placeholders = ",".join(["%s"] * len(statuses))
+        query = (
+            "SELECT t.status, t.building_id, t.specialist_id,"
+            " u.firstname AS specialist_firstname, u.lastname AS specialist_lastname,"
+            f" {_BUILDING_LABEL.format('b.')} AS building_description,"
+            " COUNT(*) AS cnt"
+            f" FROM {self.tickets_table} t"
+            f" LEFT JOIN {self.users_table} u ON u.id = t.specialist_id"
+            f" LEFT JOIN {self.buildings_table} b ON b.id = t.building_id"
+            f" WHERE t.department_id = %s AND t.status IN ({placeholders})"
+            " GROUP BY t.status, t.building_id, t.specialist_id,"
+            " u.firstname, u.lastname, building_description"
+        )
+        params: Tuple[Any, ...] = (department_id, *statuses)
+        # Columns are selected in TicketStat field order, so rows map positionally
+        rows = self._execute_query_tuples(query, params, prepared=True)
+        return [TicketStat.from_row(row) for row in rows]
+
     def fetch_users_by_id(
         self,
         user_id: int,
     ) -> Optional[User]:
-        query = f"SELECT * FROM {self.users_table} WHERE id = %s"
+        query = (
+            f"SELECT {self._select_list(USER_COLUMNS)} FROM {self.users_table}"
+            " WHERE id = %s"
+        )
         params: Tuple[Any, ...] = (user_id,)
-        rows = self._execute_query(query, params)
-        return User.from_dict(rows[0]) if rows else None
+        rows = self._execute_query_tuples(query, params, prepared=True)
+        return User.from_row(rows[0]) if rows else None
 
     def fetch_users_by_ids(
         self,
@@ -118,45 +469,254 @@ class MySQLTicketService:
             return {}
         # Create placeholders for IN clause
         placeholders = ",".join(["%s"] * len(user_ids))
-        query = f"SELECT * FROM {self.users_table} WHERE id IN ({placeholders})"
+        query = (
+            f"SELECT {self._select_list(USER_COLUMNS)} FROM {self.users_table}"
+            f" WHERE id IN ({placeholders})"
+        )
         params: Tuple[Any, ...] = tuple(user_ids)
-        rows = self._execute_query(query, params)
+        rows = self._execute_query_tuples(query, params)
         # Return as dict mapping id -> User object
-        return {
-            row.get("id"): User.from_dict(row)
-            for row in rows
-            if row.get("id") is not None
-        }
-
-    def fetch_categories_by_department_id(self, department_id: int) -> List[Category]:
-        query = f"SELECT * FROM {self.categories_table} WHERE department_id = %s"
-        params: Tuple[Any, ...] = (department_id,)
-        rows = self._execute_query(query, params)
-        return [Category.from_dict(row) for row in rows]
-
-    def fetch_subcategories_by_category_id(self, category_id: int) -> List[SubCategory]:
-        query = f"SELECT * FROM {self.subcategories_table} WHERE category_id = %s"
-        params: Tuple[Any, ...] = (category_id,)
-        rows = self._execute_query(query, params)
-        return [SubCategory.from_dict(row) for row in rows]
+        users = map(User.from_row, rows)
+        return {user.id: user for user in users if user.id is not None}
+
+    def fetch_categories_by_department_id(
+        self, department_id: int, limit: int = REFERENCE_ROW_LIMIT
+    ) -> Sequence[Category]:
+        """
+        Categories of a department, at most `limit` (lowest ids first); cached
+        as reference data.
+        """
+        return self._reference_data(
+            ("categories", department_id, limit),
+            lambda: self._load_categories(department_id, limit),
+        )
+
+    def _load_categories(self, department_id: int, limit: int) -> Sequence[Category]:
+        query = (
+            f"SELECT {self._select_list(CATEGORY_COLUMNS)} FROM {self.categories_table}"
+            " WHERE department_id = %s ORDER BY id LIMIT %s"
+        )
+        params: Tuple[Any, ...] = (department_id, limit)
+        rows = self._execute_query_tuples(query, params, prepared=True)
+        if len(rows) >= limit:
+            logger.warning(
+                f"Categories of department {department_id} reached the"
+                f" {limit}-row limit; any past it are shown by id"
+            )
+        return tuple(map(Category.from_row, rows))
+
+    def fetch_subcategories_by_category_id(
+        self, category_id: int
+    ) -> Sequence[SubCategory]:
+        """Subcategories of one category; cached as reference data."""
+        return self.fetch_subcategories_by_category_ids([category_id])[category_id]
+
+    def fetch_subcategories_by_category_ids(
+        self,
+        category_ids: Iterable[int],
+    ) -> Mapping[int, Sequence[SubCategory]]:
+        """
+        Fetch the subcategories of several categories with IN queries (one per
+        SUBCATEGORY_ID_CHUNK ids) instead of a query per category.
+        Returns a read-only mapping category_id -> its subcategories, with
+        every requested id present (empty if it has none); cached as
+        reference data per set of category ids.
+        """
+        key = tuple(sorted(set(category_ids)))
+        if not key:
+            return MappingProxyType({})
+        return self._reference_data(
+            ("subcategories", key), lambda: self._load_subcategories(key)
+        )
+
+    def _load_subcategories(
+        self, category_ids: Tuple[int, ...]
+    ) -> Mapping[int, Sequence[SubCategory]]:
+        grouped: Dict[int, List[SubCategory]] = {cid: [] for cid in category_ids}
+        for start in range(0, len(category_ids), SUBCATEGORY_ID_CHUNK):
+            chunk = category_ids[start : start + SUBCATEGORY_ID_CHUNK]
+            placeholders = ",".join(["%s"] * len(chunk))
+            query = (
+                f"SELECT {self._select_list(SUBCATEGORY_COLUMNS)}"
+                f" FROM {self.subcategories_table}"
+                f" WHERE category_id IN ({placeholders})"
+            )
+            for row in self._execute_query_tuples(query, chunk):
+                subcategory = SubCategory.from_row(row)
+                grouped[subcategory.category_id].append(subcategory)
+        return MappingProxyType(
+            {cid: tuple(subcategories) for cid, subcategories in grouped.items()}
+        )
+
+    def missing_indexes(self) -> List[str]:
+        """
+        Names of TICKET_INDEXES not present on the tickets table. An index
+        counts as present if any index (whatever its name) starts with its columns.
+        """
+        rows = self._execute_query(f"SHOW INDEX FROM {self.tickets_table}", tuple())
+        existing: Dict[str, List[Tuple[int, str]]] = {}
+        for row in rows:
+            existing.setdefault(row["Key_name"], []).append(
+                (row["Seq_in_index"], row["Column_name"])
+            )
+        prefixes = [
+            tuple(column for _, column in sorted(columns))
+            for columns in existing.values()
+        ]
+        return [
+            name
+            for name, columns in TICKET_INDEXES.items()
+            if not any(prefix[: len(columns)] == columns for prefix in prefixes)
+        ]
+
+    def ensure_indexes(self) -> List[str]:
+        """
+        Create any missing TICKET_INDEXES and return their names. Needs the
+        INDEX privilege, and building an index on a big table takes a while,
+        so this is meant to be run by hand rather than on every start.
+        """
+        missing = self.missing_indexes()
+        if not missing:
+            return []
+        with self._connection() as connection:
+            with connection.cursor() as cursor:
+                for name in missing:
+                    columns = ", ".join(f"`{c}`" for c in TICKET_INDEXES[name])
+                    cursor.execute(
+                        f"CREATE INDEX {name} ON {self.tickets_table} ({columns})"
+                    )
+        return missing
 
     def _execute_query(
-        self, query: str, params: Tuple[Any, ...]
-    ) -> List[Dict[str, Any]]:
-        connection = self._get_connection()
-        try:
-            with connection.cursor(dictionary=True) as cursor:
+        self,
+        query: str,
+        params: Tuple[Any, ...],
+        prepared: bool = False,
+        dictionary: bool = True,
+    ) -> List[Any]:
+        """
+        Run a query and return its rows as dicts (or plain tuples with
+        `dictionary=False`). Pass `prepared=True` for fixed-shape SQL (no
+        variable-length IN lists) to run it as a server-side prepared statement
+        that is reused on later calls over the same connection.
+        """
+        with self._connection() as connection:
+            if prepared:
+                return self._execute_prepared(connection, query, params, dictionary)
+            with connection.cursor(dictionary=dictionary) as cursor:
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
                 return rows or []
-        finally:
-            connection.close()
+
+    def _execute_query_tuples(
+        self, query: str, params: Tuple[Any, ...], prepared: bool = False
+    ) -> List[Tuple[Any, ...]]:
+        """Like _execute_query, but skips building a dict per row."""
+        return self._execute_query(query, params, prepared, dictionary=False)
+
+    def _execute_prepared(
+        self,
+        connection: MySQLConnection,
+        query: str,
+        params: Tuple[Any, ...],
+        dictionary: bool,
+    ) -> List[Any]:
+        # Checkouts wrap the pool's connection in a new PooledMySQLConnection
+        # each time; the underlying connection is the stable key
+        raw = getattr(connection, "_cnx", connection)
+        session_id = connection.connection_id
+        cached = self._prepared.get(raw)
+        if cached is None or cached[0] != session_id:
+            # First use, or the connection reconnected: the old session's
+            # statements died with it. Only this thread holds `raw` now, so it
+            # is the only one that may replace its entry; other connections'
+            # cursors are never touched from here
+            with self._prepared_lock:
+                cached = self._prepared[raw] = (session_id, {})
+        statements = cached[1]
+        # Prepared cursors only skip re-preparing when given the very same str
+        # object they prepared last time, so intern the (rebuilt) SQL text
+        query = sys.intern(query)
+        key = (query, dictionary)
+        cursor = statements.get(key)
+        if cursor is None:
+            cursor = connection.cursor(prepared=True, dictionary=dictionary)
+            statements[key] = cursor
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return rows or []
+        except Error:
+            # Drop the statement so the next call prepares it afresh
+            self._close_cursors([statements.pop(key, cursor)])
+            raise
+
+    @staticmethod
+    def _close_cursors(cursors: Iterable[Any]) -> None:
+        """Close prepared cursors so the server releases their statements."""
+        for cursor in cursors:
+            try:
+                cursor.close()
+            except Error:
+                # The connection is gone, and its statements went with it
+                pass
+
+    def _stream_query(
+        self,
+        query: str,
+        params: Tuple[Any, ...],
+        batch_size: int,
+        dictionary: bool = True,
+    ) -> Iterator[Any]:
+        with self._connection() as connection:
+            with connection.cursor(dictionary=dictionary, buffered=False) as cursor:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+
+    def _iter_query(
+        self, query: str, params: Tuple[Any, ...]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Yield rows as plain tuples straight off the cursor, without collecting
+        them into a list first.
+        """
+        with self._connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(query, params)
+                yield from cursor
+
+    def _select_list(self, columns: Tuple[str, ...], alias: str = "") -> str:
+        """
+        Render `columns` for a SELECT, rejecting anything but plain identifiers.
+        With `alias`, each column is qualified by that table alias.
+        """
+        if columns == ("*",):
+            return f"{alias}.*" if alias else "*"
+        for column in columns:
+            if not self._is_safe_identifier(column):
+                raise ValueError(f"Invalid column name: {column!r}")
+        prefix = f"{alias}." if alias else ""
+        return ", ".join(f"{prefix}`{column}`" for column in columns)
 
     @staticmethod
     def _is_safe_identifier(identifier: str) -> bool:
-        return identifier.replace("_", "").isalnum()
+        return _IDENTIFIER_RE.fullmatch(identifier) is not None
+
+
+_service: Optional[MySQLTicketService] = None
+_service_lock = threading.Lock()
 
 
 # Convenience factory
 def get_ticket_service() -> MySQLTicketService:
-    return MySQLTicketService()
+    """Return the process-wide service (and so one pool), created on first call."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = MySQLTicketService()
+    return _service
@@ -0,0 +1,79 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import main
+
+
+class ChatIdsLogTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.log = Path(tmp.name) / "chat_ids.jsonl"
+        for name, value in (
+            ("CHAT_IDS_LOG", self.log),
+            ("CHAT_IDS_FILE", Path(tmp.name) / "chat_ids.json"),
+            ("tracked_chat_ids", set()),
+            ("_chat_ids_log_records", 0),
+            ("_chat_ids_log_mtime_ns", 0),
+        ):
+            patcher = mock.patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _records(self) -> list[dict]:
+        return [json.loads(line) for line in self.log.read_text().splitlines()]
+
+    def test_replay_applies_adds_and_removes(self) -> None:
+        self.log.write_text(
+            '{"op": "add", "id": 1}\n'
+            '{"op": "add", "id": 2}\n'
+            '{"op": "remove", "id": 1}\n'
+            '{"op": "add", "id": -100}\n'
+        )
+        self.assertEqual(main.load_chat_ids(), {2, -100})
+        self.assertEqual(main._chat_ids_log_records, 4)
+
+    def test_torn_last_line_is_skipped_and_log_rewritten(self) -> None:
+        self.log.write_text(
+            '{"op": "add", "id": 2}\n{"op": "add", "id": 1}\n{"op": "ad'
+        )
+        with self.assertLogs(main.logger, "WARNING"):
+            chat_ids = main.load_chat_ids()
+        self.assertEqual(chat_ids, {1, 2})
+        self.assertEqual(
+            self._records(), [{"op": "add", "id": 1}, {"op": "add", "id": 2}]
+        )
+        # Later appends must start on a fresh line
+        main.tracked_chat_ids.update(chat_ids | {3})
+        main.append_chat_ids_ops("add", [3])
+        self.assertEqual(main.load_chat_ids(), {1, 2, 3})
+
+    def test_append_compacts_past_the_factor(self) -> None:
+        main.tracked_chat_ids.add(7)
+        main.save_chat_ids(main.tracked_chat_ids)
+        for _ in range(main.CHAT_IDS_COMPACT_FACTOR - 1):
+            main.append_chat_ids_ops("add", [7])
+        self.assertEqual(len(self._records()), main.CHAT_IDS_COMPACT_FACTOR)
+
+        main.append_chat_ids_ops("add", [7])
+        self.assertEqual(self._records(), [{"op": "add", "id": 7}])
+        self.assertEqual(main._chat_ids_log_records, 1)
+
+    def test_save_writes_sorted_add_records(self) -> None:
+        main.save_chat_ids({30, -5, 12})
+        self.assertEqual(
+            self._records(),
+            [
+                {"op": "add", "id": -5},
+                {"op": "add", "id": 12},
+                {"op": "add", "id": 30},
+            ],
+        )
+        self.assertFalse(self.log.with_name(self.log.name + ".tmp").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
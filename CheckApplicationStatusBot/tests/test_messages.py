@@ -0,0 +1,94 @@
+"""Tests for the pure message-building helpers in main.py."""
+
+import re
+import unittest
+
+from telegram import MessageEntity
+
+from main import chunk_html, render_bold_lines, split_html_block
+
+# Escaped ticket text: anything but markup, plus whole &...; entities
+_QUOTED_PIECE = re.compile(r"<blockquote>(?:[^<>&]|&(?:lt|gt|amp);)*</blockquote>")
+
+
+def _ticket_block(description: str) -> str:
+    return f"<blockquote>Заявка №1\nОписание: {description}\nКабинет: 101</blockquote>"
+
+
+class ChunkHtmlTest(unittest.TestCase):
+    def test_header_only(self) -> None:
+        self.assertEqual(
+            chunk_html(["всего новых заявок: 0"]), ["всего новых заявок: 0"]
+        )
+
+    def test_packs_blocks_up_to_limit(self) -> None:
+        blocks = ["header", "a" * 40, "b" * 40, "c" * 40]
+        chunks = chunk_html(blocks, limit=100)
+        self.assertEqual(
+            chunks, ["header\n\n" + "a" * 40 + "\n\n" + "b" * 40, "c" * 40]
+        )
+
+    def test_oversized_block_is_split(self) -> None:
+        chunks = chunk_html(["a" * 5000, "b"])
+        self.assertTrue(all(len(chunk) <= 4000 for chunk in chunks))
+        self.assertEqual("".join(chunks).count("a"), 5000)
+
+    def test_split_pieces_fit_and_stay_balanced(self) -> None:
+        block = _ticket_block("x &lt;y&gt; &amp; " * 300)
+        for limit in (60, 97, 98, 99, 100, 333, 1000):
+            with self.subTest(limit=limit):
+                pieces = split_html_block(block, limit)
+                self.assertGreater(len(pieces), 1)
+                for piece in pieces:
+                    self.assertLessEqual(len(piece), limit)
+                    # Balanced tags, and no &...; entity cut in half
+                    self.assertRegex(piece, _QUOTED_PIECE)
+
+    def test_split_keeps_all_text(self) -> None:
+        block = _ticket_block("слово &lt;тег&gt; " * 200)
+        pieces = split_html_block(block, 250)
+        inner = [piece[len("<blockquote>") : -len("</blockquote>")] for piece in pieces]
+        original = block[len("<blockquote>") : -len("</blockquote>")]
+        self.assertEqual("".join(inner).replace("\n", ""), original.replace("\n", ""))
+
+    def test_chunks_of_long_ticket_list_fit(self) -> None:
+        blocks = ["всего новых заявок: 2", _ticket_block("&amp;" * 2000), "short"]
+        chunks = chunk_html(blocks, limit=500)
+        self.assertTrue(all(len(chunk) <= 500 for chunk in chunks))
+        for chunk in chunks:
+            self.assertEqual(chunk.count("<blockquote>"), chunk.count("</blockquote>"))
+
+
+class RenderBoldLinesTest(unittest.TestCase):
+    def _bold_texts(self, text: str, entities) -> list[str]:
+        # Telegram offsets count UTF-16 code units, so slice in that encoding
+        encoded = text.encode("utf-16-le")
+        return [
+            encoded[2 * e.offset : 2 * (e.offset + e.length)].decode("utf-16-le")
+            for e in entities
+        ]
+
+    def test_odd_segments_are_bold(self) -> None:
+        text, entities = render_bold_lines([["Всего: ", "5"], ["plain"]])
+        self.assertEqual(text, "Всего: 5\nplain")
+        self.assertEqual(
+            entities, (MessageEntity(MessageEntity.BOLD, offset=7, length=1),)
+        )
+
+    def test_offsets_count_utf16_code_units(self) -> None:
+        # Emoji outside the BMP take two UTF-16 code units each
+        lines = [["📬 ", "Статистика"], ["🏢 ", "Корпус Б", " — ", "3"]]
+        text, entities = render_bold_lines(lines)
+        self.assertEqual(entities[0].offset, 3)
+        self.assertEqual(
+            self._bold_texts(text, entities), ["Статистика", "Корпус Б", "3"]
+        )
+
+    def test_empty_bold_segments_get_no_entity(self) -> None:
+        text, entities = render_bold_lines([["a", "", "b"], []])
+        self.assertEqual(text, "ab\n")
+        self.assertEqual(entities, ())
+
+
+if __name__ == "__main__":
+    unittest.main()
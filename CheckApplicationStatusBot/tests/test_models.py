@@ -0,0 +1,66 @@
+"""
+Checks that the column constants the service selects match the models built
+from them. Run from the bot directory: python -m unittest
+"""
+
+import unittest
+from dataclasses import fields
+
+from models import Category, SubCategory, Ticket, TicketWithUsers, User
+from services.db_service import (
+    CATEGORY_COLUMNS,
+    SUBCATEGORY_COLUMNS,
+    TICKET_COLUMNS,
+    USER_COLUMNS,
+)
+
+
+class ColumnConstantsTest(unittest.TestCase):
+    def test_columns_match_model_fields(self) -> None:
+        # from_dict reads, and from_row expects, exactly these fields in order
+        for columns, model in (
+            (TICKET_COLUMNS, Ticket),
+            (USER_COLUMNS, User),
+            (CATEGORY_COLUMNS, Category),
+            (SUBCATEGORY_COLUMNS, SubCategory),
+        ):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(columns, tuple(f.name for f in fields(model)))
+
+    def test_from_row_matches_from_dict(self) -> None:
+        row = tuple(range(len(TICKET_COLUMNS)))
+        self.assertEqual(
+            Ticket.from_row(row), Ticket.from_dict(dict(zip(TICKET_COLUMNS, row)))
+        )
+
+
+class TicketWithUsersTest(unittest.TestCase):
+    def test_from_row_splits_joined_row(self) -> None:
+        ticket = Ticket(7, 1, 2, 3, "desc", "+7", "101", "taken", 33, 4, 5)
+        applicant = User(1, "Ivan", "Petrov", "+7")
+        specialist = User(2, "Anna", None, None)
+        row = (
+            tuple(getattr(ticket, c) for c in TICKET_COLUMNS)
+            + tuple(getattr(applicant, c) for c in USER_COLUMNS)
+            + tuple(getattr(specialist, c) for c in USER_COLUMNS)
+        )
+        self.assertEqual(
+            TicketWithUsers.from_row(row),
+            TicketWithUsers(ticket, applicant, specialist),
+        )
+
+    def test_unmatched_user_becomes_none(self) -> None:
+        ticket = Ticket(7, 1, None, 3, None, None, None, "new", 33, None, None)
+        applicant = User(1, "Ivan", None, None)
+        row = (
+            tuple(getattr(ticket, c) for c in TICKET_COLUMNS)
+            + tuple(getattr(applicant, c) for c in USER_COLUMNS)
+            + (None,) * len(USER_COLUMNS)
+        )
+        self.assertEqual(
+            TicketWithUsers.from_row(row), TicketWithUsers(ticket, applicant, None)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
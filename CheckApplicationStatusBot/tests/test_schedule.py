@@ -0,0 +1,45 @@
+import datetime
+import unittest
+
+from main import BROADCAST_TIMES, astana_tz, next_broadcast_at
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime.datetime:
+    # October 2026: the 12th is a Monday, the 16th a Friday, the 17th a Saturday
+    return datetime.datetime(2026, 10, day, hour, minute, tzinfo=astana_tz())
+
+
+class NextBroadcastAtTest(unittest.TestCase):
+    def test_next_slot_same_day(self) -> None:
+        self.assertEqual(next_broadcast_at(_at(13, 9)), _at(13, 12))
+
+    def test_exactly_on_a_slot_moves_to_the_next(self) -> None:
+        self.assertEqual(next_broadcast_at(_at(13, 12)), _at(13, 15))
+
+    def test_after_last_slot_moves_to_next_day(self) -> None:
+        self.assertEqual(next_broadcast_at(_at(13, 18)), _at(14, 8, 30))
+
+    def test_friday_after_last_slot_skips_weekend(self) -> None:
+        self.assertEqual(next_broadcast_at(_at(16, 17, 25)), _at(19, 8, 30))
+
+    def test_weekend_moves_to_monday(self) -> None:
+        self.assertEqual(next_broadcast_at(_at(17, 10)), _at(19, 8, 30))
+        self.assertEqual(next_broadcast_at(_at(18, 7)), _at(19, 8, 30))
+
+    def test_other_time_zones_are_converted(self) -> None:
+        # 23:00 UTC on Sunday is already Monday morning in Astana
+        after = datetime.datetime(2026, 10, 18, 23, tzinfo=datetime.timezone.utc)
+        self.assertEqual(next_broadcast_at(after), _at(19, 8, 30))
+
+    def test_result_is_always_a_later_weekday_slot(self) -> None:
+        after = _at(12, 0)
+        for _ in range(20):
+            slot = next_broadcast_at(after)
+            self.assertGreater(slot, after)
+            self.assertLess(slot.weekday(), 5)
+            self.assertIn(slot.timetz().replace(tzinfo=None), BROADCAST_TIMES)
+            after = slot
+
+
+if __name__ == "__main__":
+    unittest.main()